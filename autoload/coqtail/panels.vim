@@ -232,22 +232,37 @@ function! coqtail#panels#cleanuphl() abort
 endfunction
 
 " Update highlighting of the current window.
+" Only the groups whose pattern or positions changed are re-added.
 function! s:updatehl(buf, highlights) abort
-  call s:clearhl()
-  let w:coqtail_highlights = {'buf': a:buf}
+  if exists('w:coqtail_highlights') && w:coqtail_highlights['buf'] != a:buf
+    call s:clearhl()
+  endif
+  if !exists('w:coqtail_highlights')
+    let w:coqtail_highlights = {'buf': a:buf, 'applied': {}}
+  endif
+
   for [l:var, l:grp] in s:hlgroups
     let l:hl = a:highlights[l:var]
+    let l:old = get(w:coqtail_highlights['applied'], l:var, v:null)
+    if type(l:hl) == type(l:old) && l:hl ==# l:old
+      continue
+    endif
+
+    for l:match in get(w:coqtail_highlights, l:var, [])
+      call matchdelete(l:match)
+    endfor
+    let l:matches = []
     if type(l:hl) == g:coqtail#compat#t_string
-      let w:coqtail_highlights[l:var] = [matchadd(l:grp, l:hl, -10)]
+      let l:matches = [matchadd(l:grp, l:hl, -10)]
     elseif type(l:hl) == g:coqtail#compat#t_list
       " NOTE: add positions one at a time to work around 8-position maximum in
       " older Vims.
-      let l:matches = []
       for l:pos in l:hl
         let l:matches = add(l:matches, matchaddpos(l:grp, [l:pos], -10))
       endfor
-      let w:coqtail_highlights[l:var] = l:matches
     endif
+    let w:coqtail_highlights[l:var] = l:matches
+    let w:coqtail_highlights['applied'][l:var] = l:hl
   endfor
 endfunction
 
@@ -277,6 +292,41 @@ function! coqtail#panels#hide() abort
   endfor
 endfunction
 
+" Update the current buffer from 'old' to 'new' lines, only touching the lines
+" between their common prefix and suffix.
+function! s:updatelines(old, new) abort
+  if a:old == [] || a:new == []
+    call coqtail#compat#replacelines(a:new)
+    return
+  endif
+
+  " Find the common prefix and suffix
+  let l:nold = len(a:old)
+  let l:nnew = len(a:new)
+  let l:pre = 0
+  while l:pre < min([l:nold, l:nnew]) && a:old[l:pre] ==# a:new[l:pre]
+    let l:pre += 1
+  endwhile
+  let l:suf = 0
+  while l:suf < min([l:nold, l:nnew]) - l:pre
+    \ && a:old[l:nold - l:suf - 1] ==# a:new[l:nnew - l:suf - 1]
+    let l:suf += 1
+  endwhile
+
+  " Overwrite, then add or remove the lines in between
+  let l:nremoved = l:nold - l:pre - l:suf
+  let l:added = l:nnew - l:suf > l:pre ? a:new[l:pre : l:nnew - l:suf - 1] : []
+  let l:nkept = min([l:nremoved, len(l:added)])
+  if l:nkept > 0
+    call setline(l:pre + 1, l:added[: l:nkept - 1])
+  endif
+  if len(l:added) > l:nremoved
+    call append(l:pre + l:nremoved, l:added[l:nremoved :])
+  elseif len(l:added) < l:nremoved
+    call coqtail#compat#deleteline(l:pre + len(l:added) + 1, l:pre + l:nremoved)
+  endif
+endfunction
+
 " Replace the contents of 'panel' with 'txt'.
 " This function must be called in the context of the panel's window.
 function! s:replace(panel, txt, richpp, scroll) abort
@@ -293,7 +343,7 @@ function! s:replace(panel, txt, richpp, scroll) abort
   let l:old = l:old ==# [''] ? [] : l:old
   if l:old !=# a:txt
     let &l:undolevels = &l:undolevels " explicitly break undo sequence (:h undo-break)
-    call coqtail#compat#replacelines(a:txt)
+    call s:updatelines(l:old, a:txt)
   endif
 
   " Set new highlights
@@ -7,6 +7,7 @@ import re
 import socket
 import threading
 import time
+from bisect import bisect_left
 from collections import defaultdict as ddict
 from collections import deque
 from concurrent import futures
@@ -75,6 +76,16 @@ else:
 PROOF_START_PAT = re.compile(rb"^\s*(Proof)\b")
 PROOF_END_PAT = re.compile(rb"^\s*(Qed|Admitted|Defined|Abort|Save)\b")
 OPAQUE_PROOF_ENDS = {b"Qed", b"Admitted"}
+# The tokens that `_find_dot_after()` must stop at
+DOT_SEARCH_PAT = re.compile(rb'\.|\(\*|"|lp:\{\{')
+# Commands that may change where `find_lib()` locates a library
+LOADPATH_PAT = re.compile(
+    rb"\b(Require|From|Add\s+(Rec\s+)?LoadPath|Remove\s+LoadPath)\b"
+)
+# Patterns for parsing the output of `Locate` and `Locate Library`
+LOCATE_CONT_PAT = re.compile(r"\n +")
+LOCATE_ALIAS_PAT = re.compile(r"\(alias of (.*)\)")
+LOCATE_LIB_PAT = re.compile(r"file\s+(.*)\.vo")
 
 
 def lines_and_highlights(
@@ -161,6 +172,8 @@ class Coqtail:
         info_msg - Lines of text to display in the info panel
         goal_msg - Lines of text to display in the goal panel
         goal_hls - Highlight positions for each line of goal_msg
+        lib_cache - Memoized results of `find_lib()`. Cleared whenever the
+                    load path may have changed.
         """
         self.coqtop = CT.Coqtop(self.add_info_callback)
         self.handler = handler
@@ -173,6 +186,7 @@ class Coqtail:
         self.info_msg: List[str] = []
         self.goal_msg: List[str] = []
         self.goal_hls: List[Highlight] = []
+        self.lib_cache: Dict[str, Optional[str]] = {}
 
     def sync(self, opts: VimOptions) -> Optional[str]:
         """Check if the buffer has been updated and rewind Coqtop if so."""
@@ -219,6 +233,7 @@ class Coqtail:
         opts: VimOptions,
     ) -> Tuple[Optional[str], str]:
         """Start a new Coqtop instance."""
+        self.lib_cache.clear()
         try:
             err, stderr = self.coqtop.start(
                 opts["filename"],
@@ -288,6 +303,8 @@ class Coqtail:
         if extra_steps is None:
             return msg
 
+        # The rewound sentences may have changed the load path
+        self.lib_cache.clear()
         self.endpoints = self.endpoints[: -(steps + extra_steps)]
         self.omitted_proofs = [
             range_
@@ -354,7 +371,10 @@ class Coqtail:
         silent: bool = False,
     ) -> None:
         """Forward Coq query to Coqtop interface."""
-        success, msg, stderr = self.do_query(" ".join(args), opts=opts)
+        query = " ".join(args)
+        success, msg, stderr = self.do_query(query, opts=opts)
+        if LOADPATH_PAT.search(query.encode("utf-8")) is not None:
+            self.lib_cache.clear()
 
         if not success or not silent:
             self.set_info(msg, reset=True)
@@ -397,6 +417,11 @@ class Coqtail:
         while self.send_queue:
             self.refresh(goals=False, force=False, scroll=scroll, opts=opts)
             to_send = self.send_queue.popleft()
+            if admit_up_to is not None and admit_up_to["stop"] != to_send["stop"]:
+                # Inside an opaque proof in admit mode. Skip this sentence
+                # without extracting its text.
+                continue
+
             message = _between(buffer, to_send["start"], to_send["stop"])
             no_comments, _ = _strip_comments(message)
 
@@ -415,16 +440,13 @@ class Coqtail:
                             self.omitted_proofs.append(
                                 ProofRange(admit_from, admit_up_to)
                             )
-                elif admit_up_to["stop"] == to_send["stop"]:
+                else:
                     # Reached the end of an opaque proof in admit mode. Replace
                     # with `Admitted`.
                     match = PROOF_END_PAT.match(no_comments)
                     assert match is not None and match.group(1) in OPAQUE_PROOF_ENDS
                     message = no_comments = b"Admitted."
                     admit_up_to = None
-                else:
-                    # Inside an opaque proof in admit mode. Skip this sentence.
-                    continue
 
             try:
                 success, msg, err_loc, stderr = self.coqtop.dispatch(
@@ -447,6 +469,8 @@ class Coqtail:
             if success:
                 line, col = to_send["stop"]
                 self.endpoints.append((line, col + 1))
+                if LOADPATH_PAT.search(no_comments) is not None:
+                    self.lib_cache.clear()
             else:
                 self.send_queue.clear()
                 failed_at = to_send["start"]
@@ -472,8 +496,10 @@ class Coqtail:
         """Rewind to the point where all remaining endpoints are strictly
         before the specified position.
         """
-        # Count the number of endpoints after the specified location
-        steps_too_far = sum(pos >= (line, col) for pos in self.endpoints)
+        # Count the number of endpoints after the specified location.
+        # NOTE: `endpoints` is always sorted since sentences are checked in
+        # order.
+        steps_too_far = len(self.endpoints) - bisect_left(self.endpoints, (line, col))
         return self.rewind(steps_too_far, opts=opts)
 
     def do_query(self, query: str, opts: VimOptions) -> Tuple[bool, str, str]:
@@ -502,7 +528,7 @@ class Coqtail:
             return None
 
         # Join lines that start with whitespace to the previous line
-        locate = re.sub(r"\n +", " ", locate)
+        locate = LOCATE_CONT_PAT.sub(" ", locate)
 
         # Choose first match from 'Locate' since that is the default in the
         # current context
@@ -511,7 +537,7 @@ class Coqtail:
             return None
 
         # Look for alias
-        alias = re.search(r"\(alias of (.*)\)", match)
+        alias = LOCATE_ALIAS_PAT.search(match)
         if alias is not None:
             # Found an alias, search again using that
             return self.qual_name(alias.group(1), opts=opts)
@@ -528,12 +554,16 @@ class Coqtail:
 
     def find_lib(self, lib: str, opts: VimOptions) -> Optional[str]:
         """Find the path to the .v file corresponding to the libary 'lib'."""
+        if lib in self.lib_cache:
+            return self.lib_cache[lib]
+
         success, locate, _ = self.do_query(f"Locate Library {lib}.", opts=opts)
         if not success:
             return None
 
-        path = re.search(r"file\s+(.*)\.vo", locate)
-        return path.group(1) if path is not None else None
+        path = LOCATE_LIB_PAT.search(locate)
+        self.lib_cache[lib] = path.group(1) if path is not None else None
+        return self.lib_cache[lib]
 
     def find_qual(
         self,
@@ -936,6 +966,25 @@ class CoqtailHandler(StreamRequestHandler):
 
         threading.Thread(target=self.parse_msgs, daemon=True).start()
 
+        handlers: Mapping[str, Callable[..., object]] = {
+            "find_coq": self.coq.find_coq,
+            "start": self.coq.start,
+            "stop": self.coq.stop,
+            "step": self.coq.step,
+            "rewind": self.coq.rewind,
+            "to_line": self.coq.to_line,
+            "to_top": self.coq.to_top,
+            "query": self.coq.query,
+            "endpoint": self.coq.endpoint,
+            "errorpoint": self.coq.errorpoint,
+            "toggle_debug": self.coq.toggle_debug,
+            "splash": self.coq.splash,
+            "sync": self.coq.sync,
+            "find_def": self.coq.find_def,
+            "find_lib": self.coq.find_lib,
+            "refresh": self.coq.refresh,
+        }
+
         while not self.closed:
             try:
                 self.working = False
@@ -945,24 +994,6 @@ class CoqtailHandler(StreamRequestHandler):
             except EOFError:
                 break
 
-            handlers: Mapping[str, Callable[..., object]] = {
-                "find_coq": self.coq.find_coq,
-                "start": self.coq.start,
-                "stop": self.coq.stop,
-                "step": self.coq.step,
-                "rewind": self.coq.rewind,
-                "to_line": self.coq.to_line,
-                "to_top": self.coq.to_top,
-                "query": self.coq.query,
-                "endpoint": self.coq.endpoint,
-                "errorpoint": self.coq.errorpoint,
-                "toggle_debug": self.coq.toggle_debug,
-                "splash": self.coq.splash,
-                "sync": self.coq.sync,
-                "find_def": self.coq.find_def,
-                "find_lib": self.coq.find_lib,
-                "refresh": self.coq.refresh,
-            }
             handler = handlers.get(func, None)
 
             try:
@@ -1014,7 +1045,7 @@ class CoqtailHandler(StreamRequestHandler):
         # pylint: disable=attribute-defined-outside-init
         # refresh_time is defined in handle() when the connection is opened.
         if not force:
-            cur_time = time.time()
+            cur_time = time.monotonic()
             force = cur_time - self.refresh_time > self.refresh_rate
             self.refresh_time = cur_time
         if force:
@@ -1158,47 +1189,50 @@ class ChannelManager:
 
 
 # Searching for Coq Definitions #
+# Implicitly generated names (from type, to type, pattern, name group)
+AUTO_NAMES = (
+    ("Constructor", "Inductive", re.compile(r"Build_(.*)"), 1),
+    ("Constant", "Inductive", re.compile(r"(.*)_(ind|rect?)"), 1),
+)
+# The Vernacular commands that define each type of object
+TYPE_TO_VERNAC = {
+    "Inductive": ["(Co)?Inductive", "Variant", "Class", "Record"],
+    "Constant": [
+        "Definition",
+        "Let",
+        "(Co)?Fixpoint",
+        "Function",
+        "Instance",
+        "Theorem",
+        "Lemma",
+        "Remark",
+        "Fact",
+        "Corollary",
+        "Proposition",
+        "Example",
+        "Parameters?",
+        "Axioms?",
+        "Conjectures?",
+    ],
+    "Notation": ["Notation"],
+    "Variable": ["Variables?", "Hypothes[ie]s", "Context"],
+    "Ltac": ["Ltac"],
+    "Module": ["Module"],
+    "Module Type": ["Module Type"],
+}
+
+
 # TODO: could search more intelligently by searching only within relevant
 # section/module, or sometimes by looking at the type (for constructors for
 # example, or record projections)
 def get_searches(tgt_type: str, tgt_name: str) -> List[str]:
     """Construct a search expression given an object type and name."""
-    auto_names = [
-        ("Constructor", "Inductive", "Build_(.*)", 1),
-        ("Constant", "Inductive", "(.*)_(ind|rect?)", 1),
-    ]
-    type_to_vernac = {
-        "Inductive": ["(Co)?Inductive", "Variant", "Class", "Record"],
-        "Constant": [
-            "Definition",
-            "Let",
-            "(Co)?Fixpoint",
-            "Function",
-            "Instance",
-            "Theorem",
-            "Lemma",
-            "Remark",
-            "Fact",
-            "Corollary",
-            "Proposition",
-            "Example",
-            "Parameters?",
-            "Axioms?",
-            "Conjectures?",
-        ],
-        "Notation": ["Notation"],
-        "Variable": ["Variables?", "Hypothes[ie]s", "Context"],
-        "Ltac": ["Ltac"],
-        "Module": ["Module"],
-        "Module Type": ["Module Type"],
-    }
-
     # Look for some implicitly generated names
     search_names = [tgt_name]
     search_types = [tgt_type]
-    for from_type, to_type, pat, grp in auto_names:
+    for from_type, to_type, pat, grp in AUTO_NAMES:
         if tgt_type == from_type:
-            match = re.match(pat, tgt_name)
+            match = pat.match(tgt_name)
             if match is not None:
                 search_names.append(match.group(grp))
                 search_types.append(to_type)
@@ -1206,7 +1240,7 @@ def get_searches(tgt_type: str, tgt_name: str) -> List[str]:
 
     # What Vernacular command to look for
     search_vernac = "|".join(
-        vernac for typ in search_types for vernac in type_to_vernac.get(typ, [])
+        vernac for typ in search_types for vernac in TYPE_TO_VERNAC.get(typ, [])
     )
 
     return [
@@ -1218,11 +1252,10 @@ def get_searches(tgt_type: str, tgt_name: str) -> List[str]:
 # Finding Start and End of Coq Chunks #
 def _pos_from_offset(col: int, msg: bytes, offset: int) -> Tuple[int, int]:
     """Calculate the line and column of a given offset."""
-    msg = msg[:offset]
-    lines = msg.split(b"\n")
-
-    line = len(lines) - 1
-    col = len(lines[-1]) + (col if line == 0 else 0)
+    offset = min(offset, len(msg))
+    line = msg.count(b"\n", 0, offset)
+    line_start = msg.rfind(b"\n", 0, offset) + 1
+    col = offset - line_start + (col if line == 0 else 0)
 
     return (line, col)
 
@@ -1345,49 +1378,44 @@ def _find_dot_after(lines: Sequence[bytes], sline: int, scol: int) -> Tuple[int,
     max_line = len(lines)
 
     while sline < max_line:
-        line = lines[sline][scol:]
-        dot_pos = line.find(b".")
-        com_pos = line.find(b"(*")
-        str_pos = line.find(b'"')
-        elpi_pos = line.find(b"lp:{{")
-
-        first_pos = dot_pos
-        for p in (com_pos, str_pos, elpi_pos):
-            if first_pos == -1 or (0 <= p < first_pos):
-                first_pos = p
-
-        if first_pos == -1:
+        line = lines[sline]
+        match = DOT_SEARCH_PAT.search(line, scol)
+
+        if match is None:
             # Nothing on this line
             sline += 1
             scol = 0
-        elif first_pos == com_pos:
+            continue
+
+        tok, pos = match.group(), match.start()
+        if tok == b"(*":
             # We see a comment opening before the next '.'
-            com_end = _skip_comment(lines, sline, scol + com_pos)
+            com_end = _skip_comment(lines, sline, pos)
             if com_end is None:
-                raise UnmatchedError("(*", (sline, scol + com_pos))
+                raise UnmatchedError("(*", (sline, pos))
             sline, scol = com_end
-        elif first_pos == str_pos:
+        elif tok == b'"':
             # We see a string starting before the next '.'
-            str_end = _skip_str(lines, sline, scol + str_pos)
+            str_end = _skip_str(lines, sline, pos)
             if str_end is None:
-                raise UnmatchedError('"', (sline, scol + str_pos))
+                raise UnmatchedError('"', (sline, pos))
             sline, scol = str_end
-        elif first_pos == elpi_pos:
-            lp_end = _skip_elpi(lines, sline, scol + elpi_pos)
+        elif tok == b"lp:{{":
+            lp_end = _skip_elpi(lines, sline, pos)
             if lp_end is None:
-                raise UnmatchedError("lp:{{", (sline, scol + elpi_pos))
+                raise UnmatchedError("lp:{{", (sline, pos))
             sline, scol = lp_end
-        elif line[dot_pos : dot_pos + 2].rstrip() == b".":
+        elif line[pos : pos + 2].rstrip() == b".":
             # Don't stop for '.' used in qualified name or for '..'
-            return (sline, scol + dot_pos)
-        elif line[dot_pos : dot_pos + 3] == b"...":
+            return (sline, pos)
+        elif line[pos : pos + 3] == b"...":
             # But do allow '...'
-            return (sline, scol + dot_pos + 2)
-        elif line[dot_pos : dot_pos + 2] == b"..":
+            return (sline, pos + 2)
+        elif line[pos : pos + 2] == b"..":
             # Skip second '.'
-            scol += dot_pos + 2
+            scol = pos + 2
         else:
-            scol += dot_pos + 1
+            scol = pos + 1
 
     raise NoDotError()
 
@@ -1472,18 +1500,19 @@ def _skip_block(
             blk_start = None
         assert blk_start is None or blk_end is None or blk_start < blk_end
 
-        # Look for contained blocks to skip
-        skip_stop = blk_start if blk_start is not None else blk_end
-        skip_starts = [(line.find(skip, scol, skip_stop), skip) for skip in skips]
-        skip_starts = [(start, skip) for start, skip in skip_starts if start != -1]
-        skip_start, skip = min(skip_starts, default=(None, None))
-        if skip is not None and skip_start is not None:
-            skip_end = skips[skip](lines, sline, skip_start)
-            if skip_end is None:
-                return None
-
-            sline, scol = skip_end
-            continue
+        # Look for contained blocks to skip (comments and strings have none)
+        if skips:
+            skip_stop = blk_start if blk_start is not None else blk_end
+            skip_starts = [(line.find(skip, scol, skip_stop), skip) for skip in skips]
+            skip_starts = [(start, skip) for start, skip in skip_starts if start != -1]
+            skip_start, skip = min(skip_starts, default=(None, None))
+            if skip is not None and skip_start is not None:
+                skip_end = skips[skip](lines, sline, skip_start)
+                if skip_end is None:
+                    return None
+
+                sline, scol = skip_end
+                continue
 
         if blk_end is not None and blk_start is None:
             # Found an end and no new start
@@ -1537,6 +1566,15 @@ class Matcher:
 
         if lines.start == lines.stop - 1:
             return self._matcher[lines.start, "l"] + self._matcher[cols, "c"]
+        if cols.start == 1 and lines.start + 1 < lines.stop - 1:
+            # The first line is matched in full, so it can share a single line
+            # range with the middle lines (e.g., the checked region)
+            return (
+                self._matcher[lines.start : lines.stop - 1, "l"]
+                + r"\|"
+                + self._matcher[lines.stop - 1, "l"]
+                + self._matcher[: cols.stop, "c"]
+            )
         return r"\|".join(
             x
             for x in (
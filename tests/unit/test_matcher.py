@@ -9,15 +9,17 @@ from coqtail import matcher
 # Test name, generated match pattern, expected match pattern
 tests = (
     ("Both lines, both cols", matcher[1:5, 1:5], r"\%2l\%>1c\|\%>2l\%<5l\|\%5l\%<6c"),
-    ("Both lines, 1 start col", matcher[1:5, 0:5], r"\%2l\|\%>2l\%<5l\|\%5l\%<6c"),
-    ("Both lines, no start col", matcher[1:5, :5], r"\%2l\|\%>2l\%<5l\|\%5l\%<6c"),
+    ("Both lines, 1 start col", matcher[1:5, 0:5], r"\%>1l\%<5l\|\%5l\%<6c"),
+    ("Both lines, no start col", matcher[1:5, :5], r"\%>1l\%<5l\|\%5l\%<6c"),
     ("Both lines, no end col", matcher[1:5, 1:], r"\%2l\%>1c\|\%>2l\%<5l\|\%5l"),
-    ("Both lines, no col", matcher[1:5, :], r"\%2l\|\%>2l\%<5l\|\%5l"),
+    ("Both lines, no col", matcher[1:5, :], r"\%>1l\%<5l\|\%5l"),
     ("0 start line, both cols", matcher[0:5, 1:5], r"\%1l\%>1c\|\%>1l\%<5l\|\%5l\%<6c"),
     ("No start line, both cols", matcher[:5, 1:5], r"\%1l\%>1c\|\%>1l\%<5l\|\%5l\%<6c"),
+    ("No start line, no start col", matcher[:5, :5], r"\%<5l\|\%5l\%<6c"),
     ("One line, both cols", matcher[1:2, 1:5], r"\%2l\%>1c\%<6c"),
     ("One line, no col", matcher[1:2, :], r"\%2l"),
     ("Two lines, both cols", matcher[1:3, 1:5], r"\%2l\%>1c\|\%3l\%<6c"),
+    ("Two lines, no start col", matcher[1:3, :5], r"\%2l\|\%3l\%<6c"),
 )
 
 
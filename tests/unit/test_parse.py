@@ -12,6 +12,7 @@ from coqtail import (
     UnmatchedError,
     _find_opaque_proof_end,
     _get_message_range,
+    _pos_from_offset,
     _strip_comments,
 )
 
@@ -44,6 +45,7 @@ _parse_tests: Sequence[_ParseTest] = [
     ("str", ['A "B.".'], (0, 6)),
     ("str nest", ['A """B.""".'], (0, 10)),
     ("qualified", ["A.B."], (0, 3)),
+    ("qualified comment str", ['A.B (* c. *) "d." C.D.'], (0, 21)),
     ("multi line", ["A", "B."], (1, 1)),
     ("multi line comment", ["A (*", ". *) B."], (1, 6)),
     ("multi line string", ['A "', '." B.'], (1, 4)),
@@ -143,6 +145,34 @@ def test_parse(
             assert e.value.range == stop_or_ex.range
 
 
+# Test name, start column, input string, offset, output position
+PosTest = Tuple[str, int, bytes, int, Tuple[int, int]]
+
+pos_tests: Sequence[PosTest] = (
+    ("start", 0, b"abc", 0, (0, 0)),
+    ("first line", 0, b"abc", 2, (0, 2)),
+    ("first line col", 4, b"abc", 2, (0, 6)),
+    ("end", 0, b"abc", 3, (0, 3)),
+    ("past end", 0, b"abc", 10, (0, 3)),
+    ("newline", 4, b"ab\ncd", 2, (0, 6)),
+    ("second line", 4, b"ab\ncd", 3, (1, 0)),
+    ("second line mid", 4, b"ab\ncd", 4, (1, 1)),
+    ("third line", 4, b"ab\n\ncd\nef", 5, (2, 1)),
+)
+
+
+@pytest.mark.parametrize("_name, col, msg, offset, expected", pos_tests)
+def test_pos_from_offset(
+    _name: str,
+    col: int,
+    msg: bytes,
+    offset: int,
+    expected: Tuple[int, int],
+) -> None:
+    """_pos_from_offset() should convert an offset to a (line, col) position."""
+    assert _pos_from_offset(col, msg, offset) == expected
+
+
 # Test name, input string, output string and comment positions
 CommentIn = bytes
 CommentOut = Tuple[bytes, Sequence[Tuple[int, int]]]